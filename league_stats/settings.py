@@ -79,3 +79,6 @@ MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Empty key -> AI scouting reports fall back to the local stats summary
+OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
@@ -6,6 +6,19 @@ from .models import Team, Player
 @admin.register(Team)
 class TeamAdmin(admin.ModelAdmin):
     list_display = ("name",)
+    # Derived data: maintained by Team.refresh_stats() and ai_client
+    readonly_fields = (
+        "team_points_sum",
+        "team_rebounds_sum",
+        "avg_rating",
+        "best_scorer",
+        "best_rebounder",
+        "assist_leader",
+        "ai_report",
+        "ai_report_generated_at",
+        "ai_report_digest",
+        "ai_report_failed_at",
+    )
 
 
 @admin.register(Player)
@@ -30,3 +43,22 @@ class PlayerAdmin(admin.ModelAdmin):
     )
     list_filter = ("team", "position")
     search_fields = ("name",)
+
+    # Keep the stored Team aggregates (Team.refresh_stats) in sync with edits
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        obj.team.refresh_stats()
+        old_team = form.initial.get("team")
+        if change and old_team and old_team != obj.team_id:
+            Team.objects.get(pk=old_team).refresh_stats()
+
+    def delete_model(self, request, obj):
+        team = obj.team
+        super().delete_model(request, obj)
+        team.refresh_stats()
+
+    def delete_queryset(self, request, queryset):
+        teams = list(Team.objects.filter(player__in=queryset).distinct())
+        super().delete_queryset(request, queryset)
+        for team in teams:
+            team.refresh_stats()
@@ -1,59 +1,202 @@
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
 from django.conf import settings
-from openai import OpenAI
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils import timezone
+from openai import AsyncOpenAI, OpenAI
+
+# How long a stored report is served before a background refresh is queued
+REPORT_TTL = timedelta(hours=24)
+# After a failed refresh, page views don't queue another one for this long
+REPORT_RETRY_AFTER = timedelta(minutes=10)
+
+# Each stored report keeps the digest of its prompt (Team.ai_report_digest):
+# a refresh for an unchanged roster only bumps the timestamp. Answers are
+# also cached by digest, well past REPORT_TTL, for re-imports that reset a
+# team's stored report.
+REPORT_MODEL = "gpt-5"
+REPORT_CACHE_TIMEOUT = 60 * 60 * 24 * 30
+
+# One sync client per process so calls reuse its HTTP connection pool
+_client = None
 
-def generate_team_report(team, players):
-    # Safe fallback if no key (works offline)
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="team-report")
+_pending = set()
+_pending_lock = threading.Lock()
+
+def generate_team_report(team):
+    """
+    Return the stored AI report for `team` without waiting on OpenAI.
+    Missing or stale reports are regenerated on a worker thread. Returns
+    None when no key is configured or nothing is stored yet, so callers
+    can fall back to the local stats summary.
+    """
     if not settings.OPENAI_API_KEY:
-        return _fallback_report(team, players)
+        return None
+
+    now = timezone.now()
+    generated_at = team.ai_report_generated_at
+    if team.ai_report and generated_at and now - generated_at < REPORT_TTL:
+        return team.ai_report
+
+    # back off after a failure (bad key, OpenAI outage) instead of making
+    # every page view an outbound call
+    failed_at = team.ai_report_failed_at
+    if not (failed_at and now - failed_at < REPORT_RETRY_AFTER):
+        schedule_team_report(team.id)
+    return team.ai_report or None
+
+def schedule_team_report(team_id):
+    """Queue a background refresh unless one is already pending for this team."""
+    with _pending_lock:
+        if team_id in _pending:
+            return
+        _pending.add(team_id)
+    _executor.submit(regenerate_team_report, team_id)
 
+def regenerate_team_report(team_id):
+    """Blocking: call OpenAI for one team and store the result on the Team row."""
+    from .models import Team
+
+    close_old_connections()
     try:
-        client = OpenAI(api_key=settings.OPENAI_API_KEY)
-
-        lines = []
-        for p in players:
-            lines.append(
-                f"{p.name} ({p.position}) - {p.points_per_game:.1f} PTS, "
-                f"{p.rebounds_per_game:.1f} REB, {p.assists_per_game:.1f} AST; "
-                f"rating {p.rating:.1f}"
+        team = Team.objects.filter(pk=team_id).first()
+        if team is None:
+            return None
+        prompt = _build_prompt(team, list(team.player_set.all()))
+        digest = _prompt_digest(prompt)
+        if team.ai_report and team.ai_report_digest == digest:
+            # roster unchanged since the stored report: just mark it fresh
+            Team.objects.filter(pk=team_id).update(ai_report_generated_at=timezone.now())
+            return team.ai_report
+
+        text = _request_report(prompt, digest)
+        if not text:
+            # keep the previous report; retried after REPORT_RETRY_AFTER
+            Team.objects.filter(pk=team_id).update(ai_report_failed_at=timezone.now())
+            return None
+        Team.objects.filter(pk=team_id).update(
+            ai_report=text, ai_report_digest=digest,
+            ai_report_generated_at=timezone.now(), ai_report_failed_at=None,
+        )
+        return text
+    finally:
+        with _pending_lock:
+            _pending.discard(team_id)
+        close_old_connections()
+
+def regenerate_all(teams):
+    """
+    Blocking: refresh the stored report of every team in `teams` with
+    concurrent OpenAI calls, so the wall time is roughly that of the
+    slowest single call. Returns the number of reports updated.
+    """
+    from .models import Team
+
+    if not settings.OPENAI_API_KEY:
+        return 0
+
+    # ORM access and prompt building stay on this (sync) side; only the
+    # HTTP calls for rosters that changed since their stored report run async
+    now = timezone.now()
+    unchanged, pending = [], []
+    for team in teams:
+        prompt = _build_prompt(team, list(team.player_set.all()))
+        digest = _prompt_digest(prompt)
+        if team.ai_report and team.ai_report_digest == digest:
+            unchanged.append(team.pk)
+        else:
+            pending.append((team, prompt, digest))
+
+    Team.objects.filter(pk__in=unchanged).update(ai_report_generated_at=now)
+    texts = asyncio.run(_request_reports_async(pending)) if pending else []
+
+    updated = len(unchanged)
+    for (team, _, digest), text in zip(pending, texts):
+        if text:
+            Team.objects.filter(pk=team.pk).update(
+                ai_report=text, ai_report_digest=digest,
+                ai_report_generated_at=now, ai_report_failed_at=None,
             )
-        roster = "\n".join(lines) if lines else "No players."
+            updated += 1
+        else:
+            Team.objects.filter(pk=team.pk).update(ai_report_failed_at=now)
+    return updated
 
-        prompt = f"""
+async def _request_reports_async(pending):
+    async with AsyncOpenAI(api_key=settings.OPENAI_API_KEY) as client:
+        results = await asyncio.gather(*(
+            generate_team_report_async(client, prompt, digest)
+            for _, prompt, digest in pending
+        ), return_exceptions=True)
+    # one failing team must not cost the others their reports
+    return [None if isinstance(r, BaseException) else r for r in results]
+
+async def generate_team_report_async(client, prompt, digest):
+    """Async counterpart of _request_report using a shared AsyncOpenAI client."""
+    key = _cache_key(digest)
+    try:
+        cached = await cache.aget(key)
+        if cached:
+            return cached
+
+        resp = await client.responses.create(model=REPORT_MODEL, input=prompt)
+        text = resp.output[0].content[0].text.strip() or None
+    except Exception:
+        return None
+
+    if text:
+        await cache.aset(key, text, timeout=REPORT_CACHE_TIMEOUT)
+    return text
+
+def _request_report(prompt, digest):
+    key = _cache_key(digest)
+    try:
+        cached = cache.get(key)
+        if cached:
+            return cached
+
+        resp = _get_client().responses.create(model=REPORT_MODEL, input=prompt)
+        text = resp.output[0].content[0].text.strip() or None
+    except Exception:
+        return None
+
+    if text:
+        cache.set(key, text, timeout=REPORT_CACHE_TIMEOUT)
+    return text
+
+def _get_client():
+    global _client
+    if _client is None:
+        _client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    return _client
+
+def _prompt_digest(prompt):
+    """The prompt holds every stat sent to the model, so its digest identifies the report."""
+    return hashlib.sha256(f"{REPORT_MODEL}\n{prompt}".encode("utf-8")).hexdigest()
+
+def _cache_key(digest):
+    return f"team_report:{digest}"
+
+def _build_prompt(team, players):
+    lines = []
+    for p in players:
+        lines.append(
+            f"{p.name} ({p.position}) - {p.points_per_game or 0:.1f} PTS, "
+            f"{p.rebounds_per_game or 0:.1f} REB, {p.assists_per_game or 0:.1f} AST; "
+            f"rating {p.rating or 0:.1f}"
+        )
+    roster = "\n".join(lines) if lines else "No players."
+
+    return f"""
 Analyze basketball team "{team.name}" using these player stats:
 
 {roster}
 
 Write 3–5 sentences about: main scorers, rebounders, playmaking, and a quick style/strengths note. Be concise.
 """
-        resp = client.responses.create(model="gpt-5", input=prompt)
-        return resp.output[0].content[0].text.strip() or _fallback_report(team, players)
-    except Exception:
-        return _fallback_report(team, players)
-
-def _avg(seq):
-    seq = [x for x in seq if x is not None]
-    return sum(seq) / len(seq) if seq else 0.0
-
-def _fallback_report(team, players):
-    if not players:
-        return f"No player statistics available yet for {team.name}."
-
-    active = [p for p in players if p.minutes_per_game > 0 or p.points_per_game > 0]
-    if not active:
-        active = list(players)
-
-    top_pts = max(active, key=lambda p: p.points_per_game)
-    top_reb = max(active, key=lambda p: p.rebounds_per_game)
-    top_ast = max(active, key=lambda p: p.assists_per_game)
-
-    avg_pts = _avg([p.points_per_game for p in active])
-    avg_reb = _avg([p.rebounds_per_game for p in active])
-    avg_ast = _avg([p.assists_per_game for p in active])
-
-    return (
-        f"{team.name} lean on {top_pts.name} for scoring ({top_pts.points_per_game:.1f} ppg), "
-        f"{top_reb.name} on the boards ({top_reb.rebounds_per_game:.1f} rpg), and "
-        f"{top_ast.name} for playmaking ({top_ast.assists_per_game:.1f} apg). "
-        f"Across their active rotation they average roughly {avg_pts:.1f} points, "
-        f"{avg_reb:.1f} rebounds, and {avg_ast:.1f} assists per game."
-    )
@@ -1,43 +1,48 @@
 # stats/management/commands/import_players.py
 from django.core.management.base import BaseCommand, CommandError
-from django.db import transaction
+from django.db import connection, transaction
 from stats.models import Team, Player
 
+import io
+
+import numpy as np
 import pandas as pd
-import math
-import re
+from openpyxl import load_workbook
 
 # ------------------------------------------------------------
 # Helpers
 # ------------------------------------------------------------
-NAME_KEYS = {
+NAME_KEYS = frozenset({
     "player", "players", "name", "player name", "full name"
-}
+})
 
 def _clean_header(v):
     return str(v).strip().lower()
 
-def as_float(v, default=0.0):
-    try:
-        if v is None or (isinstance(v, float) and math.isnan(v)):
-            return default
-        if isinstance(v, str):
-            v = v.strip().replace(",", ".")
-        return float(v)
-    except Exception:
-        return default
-
-def as_int(v, default=0):
-    try:
-        if v is None or (isinstance(v, float) and math.isnan(v)):
-            return default
-        if isinstance(v, str):
-            v = v.strip()
-            if not re.fullmatch(r"-?\d+(\.\d+)?", v):
-                return default
-        return int(float(v))
-    except Exception:
-        return default
+# Player field -> accepted sheet headers (matched case-insensitively, first wins)
+NAME_COLUMNS = ("Player", "Players", "Name", "Player Name", "Full Name")
+
+INT_COLUMNS = {
+    "number": ("Number", "#", "No"),
+    "games": ("Games", "GP"),
+}
+
+FLOAT_COLUMNS = {
+    "minutes_per_game": ("Minutes per game", "Min", "Minutes"),
+    "points_per_game": ("Points per game", "PTS", "PPG"),
+    "rebounds_per_game": ("Rebounds per game", "REB", "RPG"),
+    "assists_per_game": ("Assists per game", "AST", "APG"),
+    "steals_per_game": ("Steals per game", "STL", "SPG"),
+    "blocks_per_game": ("Blocks per game", "BLK", "BPG"),
+    "rating": ("Rating", "Eff"),
+    "fouls_per_game": ("Fouls per game", "Fouls"),
+    "turnovers_per_game": ("Turnovers per game", "Turnovers", "TOV"),
+}
+
+PCT_COLUMNS = {
+    "two_points_pct": ("2 points %", "2PT%", "2PT %", "Two Points %"),
+    "three_points_pct": ("3 points %", "3PT%", "3PT %", "Three Points %"),
+}
 
 def norm_pos(v):
     if not v:
@@ -45,33 +50,102 @@ def norm_pos(v):
     v = str(v).strip().title()
     return v if v in {"Guard", "Forward", "Center"} else "Guard"
 
-def pct01(v):
-    """Normalize a percent into [0,1]. Accepts 61 -> 0.61, 0.61 -> 0.61."""
-    f = as_float(v, 0.0)
-    if f > 1.0:
-        f = f / 100.0
-    return max(0.0, min(1.0, f))
-
-def pick(row, *cands):
-    """Fetch value from a row using tolerant header matching."""
-    lower = {str(k).strip().lower(): k for k in row.index}
+def find_column(col_map, cands):
+    """Return the actual column for the first matching header candidate."""
     for c in cands:
-        key = str(c).strip().lower()
-        if key in lower:
-            return row[lower[key]]
+        key = _clean_header(c)
+        if key in col_map:
+            return col_map[key]
     return None
 
+# infer_dtype() results that can hold str cells
+_TEXT_DTYPES = {"string", "mixed", "mixed-integer"}
+
+def as_float_col(df, col, default=0.0):
+    """Coerce a whole column to float; bad / missing cells become `default`."""
+    if col is None:
+        return pd.Series(default, index=df.index, dtype="float64")
+    s = df[col]
+    if pd.api.types.is_datetime64_any_dtype(s) or pd.api.types.is_timedelta64_dtype(s):
+        # dates / durations are not stats (to_numeric would yield nanoseconds)
+        return pd.Series(default, index=df.index, dtype="float64")
+    if pd.api.types.infer_dtype(s, skipna=True) in _TEXT_DTYPES:
+        # only text cells need cleaning ("12,5" -> "12.5"); .str leaves
+        # numbers as NaN, so put them back instead of stringifying them
+        s = s.str.strip().str.replace(",", ".", regex=False).fillna(s)
+    # anything still unparseable (e.g. datetime.time cells) -> default
+    return pd.to_numeric(s, errors="coerce").fillna(default)
+
+def as_int_col(df, col, default=0):
+    """Coerce a whole column to int (truncating decimals)."""
+    s = as_float_col(df, col, default)
+    return s.replace([np.inf, -np.inf], default).astype("int64")
+
+def pct01_col(df, col):
+    """Normalize a percent column into [0,1]. Accepts 61 -> 0.61, 0.61 -> 0.61."""
+    s = as_float_col(df, col, 0.0)
+    return s.where(s <= 1.0, s / 100.0).clip(0.0, 1.0)
+
+def read_workbook(path):
+    """
+    Load every sheet as a header-less DataFrame using openpyxl's streaming
+    read-only mode, which skips building the full workbook object model.
+    """
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        return {
+            ws.title: pd.DataFrame(list(ws.iter_rows(values_only=True)))
+            for ws in wb.worksheets
+        }
+    finally:
+        wb.close()
+
+def delete_all_players():
+    """
+    Wipe the Player table with one DELETE statement instead of the ORM's
+    collect-then-delete. Team leader links (and the AI reports written
+    about the old rosters) are cleared first since the raw statement
+    bypasses on_delete=SET_NULL. (TRUNCATE ... CASCADE would also
+    empty stats_team, which references stats_player.)
+    """
+    Team.objects.update(
+        best_scorer=None, best_rebounder=None, assist_leader=None,
+        team_points_sum=0, team_rebounds_sum=0, avg_rating=0,
+        ai_report="", ai_report_generated_at=None, ai_report_digest="",
+        ai_report_failed_at=None,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {connection.ops.quote_name(Player._meta.db_table)}")
+
+def copy_players(team, fields):
+    """
+    PostgreSQL only: stream the parsed rows into the Player table with
+    COPY FROM STDIN, skipping model instantiation and INSERT building.
+    """
+    frame = fields.assign(team_id=team.pk)
+    qn = connection.ops.quote_name
+    columns = ", ".join(qn(Player._meta.get_field(c).column) for c in frame.columns)
+    sql = f"COPY {qn(Player._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv)"
+
+    buf = io.StringIO()
+    frame.to_csv(buf, index=False, header=False)
+    buf.seek(0)
+    with connection.cursor() as cursor:
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            cursor.copy_expert(sql, buf)
+        else:  # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(buf.getvalue())
+    return len(frame)
+
 def find_header_row(df):
     """
     Detect which row contains the actual column headers
     by scanning first ~10 rows for something that looks like a name column.
     """
-    max_check = min(10, len(df))
-    for i in range(max_check):
-        headers = [_clean_header(x) for x in df.iloc[i].values]
-        if any(h in NAME_KEYS for h in headers):
-            return i
-    return 0
+    head = df.head(10).astype(str)
+    mask = head.apply(lambda col: col.str.strip().str.lower().isin(NAME_KEYS)).any(axis=1)
+    return int(mask.to_numpy().argmax()) if mask.any() else 0
 
 # ------------------------------------------------------------
 # Command
@@ -90,22 +164,35 @@ class Command(BaseCommand):
     def handle(self, *args, **opts):
         path = opts["xlsx_path"]
         try:
-            raw_book = pd.read_excel(path, sheet_name=None, header=None, engine="openpyxl")
+            raw_book = read_workbook(path)
         except Exception as e:
             raise CommandError(f"Failed to read Excel: {e}")
 
         if opts["reset"]:
             self.stdout.write(self.style.WARNING("Deleting ALL existing players..."))
-            Player.objects.all().delete()
+            delete_all_players()
 
         total_players = 0
 
         for sheet_name, raw_df in raw_book.items():
+            if raw_df.empty:
+                self.stdout.write(self.style.WARNING(f"[{sheet_name}] skipped: empty sheet."))
+                continue
+
             hdr_idx = find_header_row(raw_df)
-            df = pd.read_excel(path, sheet_name=sheet_name, header=hdr_idx, engine="openpyxl")
-            # drop "Unnamed: ..." auto-index columns
+            # re-slice the already loaded sheet instead of parsing the file again
+            df = raw_df.iloc[hdr_idx + 1:].copy()
+            df.columns = [
+                h if pd.notna(h) else f"Unnamed: {i}"
+                for i, h in enumerate(raw_df.iloc[hdr_idx])
+            ]
+            # drop "Unnamed: ..." auto-index columns and repeated headers
             df = df.loc[:, ~df.columns.astype(str).str.startswith("Unnamed")]
-            headers_norm = [_clean_header(c) for c in df.columns]
+            df = df.loc[:, ~df.columns.duplicated()]
+            # the header row made every column object; recover numeric dtypes
+            df = df.infer_objects()
+            # normalized header -> actual column, built once per sheet
+            col_map = {_clean_header(c): c for c in df.columns}
 
             if opts["debug"]:
                 self.stdout.write(self.style.NOTICE(
@@ -115,69 +202,48 @@ class Command(BaseCommand):
             team, _ = Team.objects.get_or_create(name=str(sheet_name).strip())
 
             # ensure we really have a name column
-            if not any(h in NAME_KEYS for h in headers_norm):
+            name_col = find_column(col_map, NAME_COLUMNS)
+            if name_col is None:
                 self.stdout.write(self.style.WARNING(
                     f"[{team.name}] skipped: no 'Player/Players/Name' column found."
                 ))
                 continue
 
             # remove empty-name rows
-            name_series = None
-            for k in ("Player", "Players", "Name", "Player Name", "Full Name"):
-                if k in df.columns:
-                    name_series = df[k]
-                    break
-            if name_series is not None:
-                df = df[name_series.notna()]
-
-            created_here = 0
-            for _, row in df.iterrows():
-                # --- identity ---
-                name = pick(row, "Player", "Players", "Name", "Player Name", "Full Name")
-                if not name or (isinstance(name, float) and math.isnan(name)):
-                    continue
-                name = str(name).strip()
-
-                number    = as_int(pick(row, "Number", "#", "No"))
-                position  = norm_pos(pick(row, "Position", "Pos"))
-
-                # --- core stats ---
-                games     = as_int(pick(row, "Games", "GP"))
-                minutes   = as_float(pick(row, "Minutes per game", "Min", "MIN", "Minutes"))
-
-                pts       = as_float(pick(row, "Points per game", "PTS", "PPG"))
-                reb       = as_float(pick(row, "Rebounds per game", "REB", "RPG"))
-                ast       = as_float(pick(row, "Assists per game", "AST", "APG"))
-                stl       = as_float(pick(row, "Steals per game", "STL", "SPG"))
-                blk       = as_float(pick(row, "Blocks per game", "BLK", "BPG"))
-                rating    = as_float(pick(row, "Rating", "Eff", "EFF"))
-
-                fouls     = as_float(pick(row, "Fouls per game", "Fouls"))
-                tov       = as_float(pick(row, "Turnovers per game", "Turnovers", "TOV"))
-
-                two_pct   = pct01(pick(row, "2 points %", "2PT%", "2PT %", "Two Points %"))
-                three_pct = pct01(pick(row, "3 points %", "3PT%", "3PT %", "Three Points %"))
-
-                Player.objects.create(
-                    team=team,
-                    name=name,
-                    number=number,
-                    position=position,
-                    games=games,
-                    minutes_per_game=minutes,
-                    points_per_game=pts,
-                    rebounds_per_game=reb,
-                    assists_per_game=ast,
-                    steals_per_game=stl,
-                    blocks_per_game=blk,
-                    rating=rating,
-                    fouls_per_game=fouls,
-                    turnovers_per_game=tov,
-                    two_points_pct=two_pct,
-                    three_points_pct=three_pct,
-                )
-                created_here += 1
-                total_players += 1
+            df = df[df[name_col].notna()]
+
+            # resolve each Player field to its sheet column once, then
+            # convert whole columns instead of parsing cell by cell
+            pos_col = find_column(col_map, ("Position", "Pos"))
+
+            names = df[name_col].astype(str).str.strip()
+            fields = pd.DataFrame({"name": names}, index=df.index)
+            fields["position"] = (
+                df[pos_col].map(norm_pos) if pos_col is not None else "Guard"
+            )
+            for field, cands in INT_COLUMNS.items():
+                fields[field] = as_int_col(df, find_column(col_map, cands))
+            for field, cands in FLOAT_COLUMNS.items():
+                fields[field] = as_float_col(df, find_column(col_map, cands))
+            for field, cands in PCT_COLUMNS.items():
+                fields[field] = pct01_col(df, find_column(col_map, cands))
+            fields = fields[names != ""]
+
+            if connection.vendor == "postgresql":
+                created_here = copy_players(team, fields)
+            else:
+                batch = [
+                    Player(team=team, **row)
+                    for row in fields.to_dict("records")
+                ]
+                # one multi-row INSERT per 1000 players instead of one per row
+                Player.objects.bulk_create(batch, batch_size=1000)
+                created_here = len(batch)
+            total_players += created_here
+
+            team.refresh_stats()
+            # roster changed: next team page view queues a fresh AI report
+            Team.objects.filter(pk=team.pk).update(ai_report_generated_at=None)
 
             self.stdout.write(self.style.SUCCESS(f"[{team.name}] imported {created_here} players."))
 
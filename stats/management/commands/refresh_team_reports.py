@@ -0,0 +1,28 @@
+# stats/management/commands/refresh_team_reports.py
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from stats.ai_client import regenerate_all
+from stats.models import Team
+
+
+class Command(BaseCommand):
+    help = "Regenerate the stored OpenAI scouting report of every team (concurrent calls)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--team", action="append", dest="teams", default=[],
+                            help="Only refresh this team name (repeatable)")
+
+    def handle(self, *args, **opts):
+        if not settings.OPENAI_API_KEY:
+            raise CommandError("OPENAI_API_KEY is not set.")
+
+        teams = Team.objects.prefetch_related("player_set").order_by("name")
+        if opts["teams"]:
+            teams = teams.filter(name__in=opts["teams"])
+
+        teams = list(teams)
+        updated = regenerate_all(teams)
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. Refreshed {updated} of {len(teams)} team reports."
+        ))
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.4 on 2026-10-15 21:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stats', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team',
+            name='ai_report',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='ai_report_generated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.4 on 2026-10-15 21:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stats', '0002_team_ai_report'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['-rating', '-points_per_game'], name='stats_playe_rating_4c2bb7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['team', '-points_per_game'], name='stats_playe_team_id_52b522_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['points_per_game'], name='stats_playe_points__af78f7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['rebounds_per_game'], name='stats_playe_rebound_c4f77b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['assists_per_game'], name='stats_playe_assists_dba946_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['minutes_per_game'], name='stats_playe_minutes_05abfd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['fouls_per_game'], name='stats_playe_fouls_p_4794b2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['two_points_pct'], name='stats_playe_two_poi_92a297_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['three_points_pct'], name='stats_playe_three_p_e01691_idx'),
+        ),
+    ]
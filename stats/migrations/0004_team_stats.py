@@ -0,0 +1,73 @@
+# Generated by Django 5.0.4 on 2026-10-15 21:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_team_stats(apps, schema_editor):
+    # Historical models have no refresh_stats(); mirror it here
+    Team = apps.get_model("stats", "Team")
+    Player = apps.get_model("stats", "Player")
+    for team in Team.objects.all():
+        players = Player.objects.filter(team=team)
+        agg = players.aggregate(
+            total_pts=models.Sum("points_per_game"),
+            total_reb=models.Sum("rebounds_per_game"),
+            avg_rating=models.Avg("rating"),
+        )
+
+        def leader(field):
+            return (
+                players.exclude(**{f"{field}__isnull": True})
+                .order_by(f"-{field}")
+                .first()
+            )
+
+        team.team_points_sum = agg["total_pts"] or 0
+        team.team_rebounds_sum = agg["total_reb"] or 0
+        team.avg_rating = agg["avg_rating"] or 0
+        team.best_scorer = leader("points_per_game")
+        team.best_rebounder = leader("rebounds_per_game")
+        team.assist_leader = leader("assists_per_game")
+        team.save()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stats', '0003_player_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team',
+            name='assist_leader',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='stats.player'),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='avg_rating',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='best_rebounder',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='stats.player'),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='best_scorer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='stats.player'),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='team_points_sum',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='team_rebounds_sum',
+            field=models.FloatField(default=0),
+        ),
+        migrations.RunPython(fill_team_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.4 on 2026-10-15 22:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stats', '0004_team_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team',
+            name='ai_report_digest',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -6,10 +6,68 @@ class Team(models.Model):
     name = models.CharField(max_length=100)
     # Logos uploaded in admin
     logo = models.ImageField(upload_to="team_logos/", blank=True, null=True)
+    # Last OpenAI scouting report, refreshed in the background (see ai_client)
+    ai_report = models.TextField(blank=True, default="")
+    ai_report_generated_at = models.DateTimeField(blank=True, null=True)
+    # sha256 of the prompt behind ai_report; an unchanged roster skips the call
+    ai_report_digest = models.CharField(max_length=64, blank=True, default="")
+    # Last failed refresh; page views wait ai_client.REPORT_RETRY_AFTER to retry
+    ai_report_failed_at = models.DateTimeField(blank=True, null=True)
+
+    # Roster aggregates, stored so pages don't recompute them per request.
+    # Kept current by refresh_stats() (import_players, Player admin).
+    team_points_sum = models.FloatField(default=0)
+    team_rebounds_sum = models.FloatField(default=0)
+    avg_rating = models.FloatField(default=0)
+    best_scorer = models.ForeignKey(
+        "Player", on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    best_rebounder = models.ForeignKey(
+        "Player", on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    assist_leader = models.ForeignKey(
+        "Player", on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
 
     def __str__(self):
         return self.name
 
+    def refresh_stats(self):
+        """
+        Recompute the stored roster aggregates and leaders. Totals, average
+        and leaders are correlated subqueries of a single UPDATE statement.
+        """
+        players = Player.objects.filter(team=models.OuterRef("pk"))
+
+        def per_team(agg):
+            return models.functions.Coalesce(
+                models.Subquery(
+                    players.values("team").annotate(v=agg).values("v")
+                ),
+                0.0,
+                output_field=models.FloatField(),
+            )
+
+        def leader(field):
+            return models.Subquery(
+                players.exclude(**{f"{field}__isnull": True})
+                .order_by(f"-{field}")
+                .values("pk")[:1]
+            )
+
+        Team.objects.filter(pk=self.pk).update(
+            team_points_sum=per_team(models.Sum("points_per_game")),
+            team_rebounds_sum=per_team(models.Sum("rebounds_per_game")),
+            avg_rating=per_team(models.Avg("rating")),
+            best_scorer=leader("points_per_game"),
+            best_rebounder=leader("rebounds_per_game"),
+            assist_leader=leader("assists_per_game"),
+        )
+        self.refresh_from_db(fields=[
+            "team_points_sum", "team_rebounds_sum", "avg_rating",
+            "best_scorer", "best_rebounder", "assist_leader",
+        ])
+
 
 class Player(models.Model):
     POSITION_CHOICES = [
@@ -39,5 +97,30 @@ class Player(models.Model):
     three_points_pct = models.FloatField(null=True, blank=True)
     rating = models.FloatField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # player_search default ordering
+            models.Index(fields=["-rating", "-points_per_game"]),
+            # team_detail roster ordering
+            models.Index(fields=["team", "-points_per_game"]),
+            # player_search range filters / league leaders
+            models.Index(fields=["points_per_game"]),
+            models.Index(fields=["rebounds_per_game"]),
+            models.Index(fields=["assists_per_game"]),
+            models.Index(fields=["minutes_per_game"]),
+            models.Index(fields=["fouls_per_game"]),
+            models.Index(fields=["two_points_pct"]),
+            models.Index(fields=["three_points_pct"]),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.team.name})"
+
+    # Percentages are stored as fractions; templates show them as 0-100
+    @property
+    def two_pct_display(self):
+        return (self.two_points_pct or 0) * 100
+
+    @property
+    def three_pct_display(self):
+        return (self.three_points_pct or 0) * 100
@@ -1,3 +1,361 @@
-from django.test import TestCase
+import datetime
+import os
+import tempfile
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from openpyxl import Workbook
+
+from . import ai_client
+from .models import Player, Team
+
+
+class ImportPlayersTests(TestCase):
+    """Run import_players on small generated workbooks."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def make_workbook(self, sheets):
+        """sheets: {sheet name: list of row tuples}. Returns the file path."""
+        wb = Workbook()
+        wb.remove(wb.active)
+        for title, rows in sheets.items():
+            ws = wb.create_sheet(title)
+            for row in rows:
+                ws.append(row)
+        path = os.path.join(self.tmpdir.name, "players.xlsx")
+        wb.save(path)
+        return path
+
+    def run_import(self, sheets, *args):
+        call_command("import_players", self.make_workbook(sheets), *args, stdout=StringIO())
+
+    def player(self, name):
+        return Player.objects.get(name=name)
+
+    def test_header_row_below_title_rows(self):
+        self.run_import({"Sagesse": [
+            ("Season 2025",),
+            (None,),
+            ("Players", "Number", "Position", "Points per game"),
+            ("John Doe", 7, "forward", 12.5),
+        ]})
+
+        p = self.player("John Doe")
+        self.assertEqual(p.team.name, "Sagesse")
+        self.assertEqual(p.number, 7)
+        self.assertEqual(p.position, "Forward")
+        self.assertEqual(p.points_per_game, 12.5)
+
+    def test_header_aliases_are_case_insensitive(self):
+        self.run_import({"Riyadi": [
+            ("PLAYER", "#", "pos", "pts", "reb", "gp"),
+            ("Jane Roe", "11", "Center", 20, 9.5, 4),
+        ]})
+
+        p = self.player("Jane Roe")
+        self.assertEqual(p.number, 11)
+        self.assertEqual(p.position, "Center")
+        self.assertEqual(p.points_per_game, 20.0)
+        self.assertEqual(p.rebounds_per_game, 9.5)
+        self.assertEqual(p.games, 4)
+
+    def test_comma_decimals(self):
+        self.run_import({"T": [
+            ("Name", "PTS", "Min"),
+            ("A", "25,5", " 30,25 "),
+            ("B", 3, "12"),
+        ]})
+
+        self.assertEqual(self.player("A").points_per_game, 25.5)
+        self.assertEqual(self.player("A").minutes_per_game, 30.25)
+        self.assertEqual(self.player("B").points_per_game, 3.0)
+        self.assertEqual(self.player("B").minutes_per_game, 12.0)
+
+    def test_percentages_accept_whole_numbers_and_fractions(self):
+        self.run_import({"T": [
+            ("Name", "2 points %", "3 points %"),
+            ("A", 55, 0.55),
+            ("B", 150, -3),
+            ("C", None, "x"),
+        ]})
+
+        self.assertAlmostEqual(self.player("A").two_points_pct, 0.55)
+        self.assertAlmostEqual(self.player("A").three_points_pct, 0.55)
+        self.assertEqual(self.player("B").two_points_pct, 1.0)
+        self.assertEqual(self.player("B").three_points_pct, 0.0)
+        self.assertEqual(self.player("C").two_points_pct, 0.0)
+        self.assertEqual(self.player("C").three_points_pct, 0.0)
+
+    def test_blank_and_whitespace_names_are_dropped(self):
+        self.run_import({"T": [
+            ("Name", "PTS"),
+            ("  Padded  ", 1),
+            (None, 2),
+            ("   ", 3),
+            ("", 4),
+        ]})
+
+        self.assertEqual(list(Player.objects.values_list("name", flat=True)), ["Padded"])
+
+    def test_non_string_cells_in_stat_columns(self):
+        self.run_import({"T": [
+            ("Name", "Minutes per game", "Games", "PTS", "Number"),
+            ("A", datetime.time(12, 30), datetime.datetime(2025, 1, 1), True, 4.9),
+            ("B", "bad", "3", None, "n/a"),
+        ]})
+
+        a, b = self.player("A"), self.player("B")
+        self.assertEqual(a.minutes_per_game, 0.0)
+        self.assertEqual(a.games, 0)
+        self.assertEqual(a.number, 4)
+        self.assertEqual(b.minutes_per_game, 0.0)
+        self.assertEqual(b.games, 3)
+        self.assertEqual(b.points_per_game, 0.0)
+        self.assertEqual(b.number, 0)
+
+    def test_sheet_without_name_column_is_skipped(self):
+        self.run_import({
+            "Notes": [("foo", "bar"), (1, 2)],
+            "Empty": [],
+            "T": [("Name", "PTS"), ("A", 1)],
+        })
+
+        self.assertEqual(Player.objects.count(), 1)
+
+    def test_import_refreshes_team_stats(self):
+        self.run_import({"T": [
+            ("Name", "PTS", "REB", "AST", "Rating"),
+            ("A", 20, 2, 1, 10),
+            ("B", 5, 8, 6, None),
+        ]})
+
+        team = Team.objects.get(name="T")
+        self.assertEqual(team.team_points_sum, 25.0)
+        self.assertEqual(team.team_rebounds_sum, 10.0)
+        # blank stat cells import as 0, so they count toward the average
+        self.assertEqual(team.avg_rating, 5.0)
+        self.assertEqual(team.best_scorer.name, "A")
+        self.assertEqual(team.best_rebounder.name, "B")
+        self.assertEqual(team.assist_leader.name, "B")
+
+    def test_reset_replaces_existing_players(self):
+        self.run_import({"T": [("Name", "PTS"), ("Old", 1)]})
+        self.run_import({"U": [("Name", "PTS"), ("New", 2)]}, "--reset")
+
+        self.assertEqual(list(Player.objects.values_list("name", flat=True)), ["New"])
+        self.assertIsNone(Team.objects.get(name="T").best_scorer)
+
+
+class TeamDetailTests(TestCase):
+    def test_missing_leader_stats_show_no_data_text(self):
+        team = Team.objects.create(name="Sagesse")
+        for number in (1, 2):
+            Player.objects.create(
+                team=team, name=f"P{number}", number=number, position="Guard",
+                points_per_game=10, assists_per_game=2, rebounds_per_game=None,
+            )
+        team.refresh_stats()
+
+        with override_settings(OPENAI_API_KEY=""):
+            response = self.client.get(f"/team/{team.pk}/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "No player data is available yet for Sagesse.")
+
+
+def _fake_response(text):
+    return SimpleNamespace(output=[SimpleNamespace(content=[SimpleNamespace(text=text)])])
+
+
+class FakeResponses:
+    """Stands in for client.responses; fails for prompts naming a team in `fail_for`."""
+
+    def __init__(self, fail_for=()):
+        self.prompts = []
+        self.fail_for = set(fail_for)
+
+    def _answer(self, input):
+        self.prompts.append(input)
+        team = input.split('"')[1]
+        if team in self.fail_for:
+            raise RuntimeError("OpenAI unavailable")
+        return _fake_response(f"Report for {team}")
+
+    def create(self, model, input):
+        return self._answer(input)
+
+
+class FakeAsyncResponses(FakeResponses):
+    async def create(self, model, input):
+        return self._answer(input)
+
+
+class FakeAsyncOpenAI:
+    responses = None  # set per test
+
+    def __init__(self, api_key=None):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeExecutor:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append(args)
+
+
+@override_settings(OPENAI_API_KEY="test-key")
+class AIReportTests(TestCase):
+    """Stored OpenAI reports, with the client and worker pool faked out."""
+
+    def setUp(self):
+        cache.clear()
+        self.responses = FakeResponses()
+        self.executor = FakeExecutor()
+        for target, value in (
+            ("_client", SimpleNamespace(responses=self.responses)),
+            ("_executor", self.executor),
+            ("_pending", set()),
+            # the worker's connection hygiene would close the test transaction
+            ("close_old_connections", lambda: None),
+        ):
+            patcher = mock.patch.object(ai_client, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.team = Team.objects.create(name="Sagesse")
+        self.player = Player.objects.create(
+            team=self.team, name="A", number=1, position="Guard",
+            points_per_game=20, rebounds_per_game=5, assists_per_game=3, rating=15,
+        )
+
+    def refresh(self):
+        ai_client._pending.add(self.team.pk)
+        text = ai_client.regenerate_team_report(self.team.pk)
+        self.team.refresh_from_db()
+        return text
+
+    def test_no_key_returns_none_without_scheduling(self):
+        with override_settings(OPENAI_API_KEY=""):
+            self.assertIsNone(ai_client.generate_team_report(self.team))
+        self.assertEqual(self.executor.submitted, [])
+
+    def test_fresh_report_is_served_without_refresh(self):
+        Team.objects.filter(pk=self.team.pk).update(
+            ai_report="Stored", ai_report_generated_at=timezone.now()
+        )
+        self.team.refresh_from_db()
+
+        self.assertEqual(ai_client.generate_team_report(self.team), "Stored")
+        self.assertEqual(self.executor.submitted, [])
+
+    def test_missing_report_is_scheduled_once(self):
+        self.assertIsNone(ai_client.generate_team_report(self.team))
+        self.assertIsNone(ai_client.generate_team_report(self.team))
+
+        self.assertEqual(self.executor.submitted, [(self.team.pk,)])
+
+    def test_stale_report_is_served_while_refresh_is_queued(self):
+        Team.objects.filter(pk=self.team.pk).update(
+            ai_report="Old",
+            ai_report_generated_at=timezone.now() - ai_client.REPORT_TTL - datetime.timedelta(minutes=1),
+        )
+        self.team.refresh_from_db()
+
+        self.assertEqual(ai_client.generate_team_report(self.team), "Old")
+        self.assertEqual(self.executor.submitted, [(self.team.pk,)])
+
+    def test_refresh_stores_report_on_team(self):
+        self.assertEqual(self.refresh(), "Report for Sagesse")
+
+        self.assertEqual(self.team.ai_report, "Report for Sagesse")
+        self.assertEqual(len(self.team.ai_report_digest), 64)
+        self.assertIsNotNone(self.team.ai_report_generated_at)
+        self.assertNotIn(self.team.pk, ai_client._pending)
+
+    def test_unchanged_roster_skips_model_call_after_ttl(self):
+        self.refresh()
+        expired = timezone.now() - ai_client.REPORT_TTL - datetime.timedelta(hours=1)
+        Team.objects.filter(pk=self.team.pk).update(ai_report_generated_at=expired)
+        cache.clear()  # e.g. another worker process
+
+        self.assertEqual(self.refresh(), "Report for Sagesse")
+        self.assertEqual(len(self.responses.prompts), 1)
+        self.assertGreater(self.team.ai_report_generated_at, expired)
+
+    def test_changed_roster_calls_model_again(self):
+        self.refresh()
+        Player.objects.filter(pk=self.player.pk).update(points_per_game=30)
+
+        self.refresh()
+        self.assertEqual(len(self.responses.prompts), 2)
+        self.assertIn("30.0 PTS", self.responses.prompts[-1])
+
+    def test_cleared_report_is_restored_from_cache(self):
+        self.refresh()
+        Team.objects.filter(pk=self.team.pk).update(ai_report="", ai_report_digest="")
+
+        self.assertEqual(self.refresh(), "Report for Sagesse")
+        self.assertEqual(len(self.responses.prompts), 1)
+
+    def test_null_stats_do_not_break_the_prompt(self):
+        Player.objects.create(team=self.team, name="B", number=2, position="Guard")
+
+        self.assertEqual(self.refresh(), "Report for Sagesse")
+        self.assertIn("B (Guard) - 0.0 PTS", self.responses.prompts[0])
+
+    def test_failure_backs_off_before_retrying(self):
+        self.responses.fail_for.add("Sagesse")
+
+        self.assertIsNone(self.refresh())
+        self.assertEqual(self.team.ai_report, "")
+        self.assertIsNotNone(self.team.ai_report_failed_at)
+
+        ai_client.generate_team_report(self.team)
+        self.assertEqual(self.executor.submitted, [])
+
+        Team.objects.filter(pk=self.team.pk).update(
+            ai_report_failed_at=timezone.now() - ai_client.REPORT_RETRY_AFTER - datetime.timedelta(minutes=1)
+        )
+        self.team.refresh_from_db()
+        ai_client.generate_team_report(self.team)
+        self.assertEqual(self.executor.submitted, [(self.team.pk,)])
+
+    def test_regenerate_all_keeps_reports_of_teams_that_succeed(self):
+        riyadi = Team.objects.create(name="Riyadi")
+        Player.objects.create(team=riyadi, name="R", number=9, position="Center")
+        FakeAsyncOpenAI.responses = FakeAsyncResponses(fail_for={"Riyadi"})
+
+        with mock.patch.object(ai_client, "AsyncOpenAI", FakeAsyncOpenAI):
+            updated = ai_client.regenerate_all(Team.objects.order_by("name"))
+
+        self.assertEqual(updated, 1)
+        self.team.refresh_from_db()
+        riyadi.refresh_from_db()
+        self.assertEqual(self.team.ai_report, "Report for Sagesse")
+        self.assertEqual(riyadi.ai_report, "")
+        self.assertIsNotNone(riyadi.ai_report_failed_at)
+
+    def test_regenerate_all_skips_unchanged_rosters(self):
+        self.refresh()
+        FakeAsyncOpenAI.responses = FakeAsyncResponses()
+
+        with mock.patch.object(ai_client, "AsyncOpenAI", FakeAsyncOpenAI):
+            self.assertEqual(ai_client.regenerate_all([self.team]), 1)
+
+        self.assertEqual(FakeAsyncOpenAI.responses.prompts, [])
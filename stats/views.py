@@ -1,33 +1,36 @@
+from django.core.paginator import Paginator
 from django.shortcuts import render, get_object_or_404
-from django.db import models
+from .ai_client import generate_team_report
 from .models import Team, Player
 
 
+# ---------- Helpers ----------
+
+def _leader(players, field):
+    """Player with the highest non-null `field`, or None."""
+    rated = [p for p in players if getattr(p, field) is not None]
+    return max(rated, key=lambda p: getattr(p, field), default=None)
+
+
 # ---------- Helper: build a simple AI-style scouting report ----------
 
-def build_scouting_report(team, players_qs):
+def build_scouting_report(team):
     """
     Returns a short scouting report for a given team
     based only on the stats in the database.
+    Reads the aggregates stored on the Team (see Team.refresh_stats).
     """
-    if not players_qs.exists():
+    # Key players; a leader is None while nobody on the roster has that stat
+    best_scorer = team.best_scorer
+    best_rebounder = team.best_rebounder
+    assist_leader = team.assist_leader
+    if None in (best_scorer, best_rebounder, assist_leader):
         return f"No player data is available yet for {team.name}."
 
-    # Key players
-    best_scorer = players_qs.order_by("-points_per_game").first()
-    best_rebounder = players_qs.order_by("-rebounds_per_game").first()
-    assist_leader = players_qs.order_by("-assists_per_game").first()
-
     # Team totals / averages
-    team_pts = (
-        players_qs.aggregate(total=models.Sum("points_per_game"))["total"] or 0
-    )
-    team_reb = (
-        players_qs.aggregate(total=models.Sum("rebounds_per_game"))["total"] or 0
-    )
-    avg_rating = (
-        players_qs.aggregate(avg=models.Avg("rating"))["avg"] or 0
-    )
+    team_pts = team.team_points_sum
+    team_reb = team.team_rebounds_sum
+    avg_rating = team.avg_rating
 
     tempo_phrase = (
         "an up-tempo, offense-first"
@@ -62,27 +65,24 @@ def build_scouting_report(team, players_qs):
 
 def team_list(request):
     teams = Team.objects.all().order_by("name")
-    players = Player.objects.select_related("team").all()
+    # One query for every league leader, picked in Python below; only the
+    # columns the leader cards show are loaded
+    players = list(
+        Player.objects.select_related("team").only(
+            "name", "team__name",
+            "points_per_game", "rebounds_per_game", "assists_per_game",
+            "two_points_pct", "three_points_pct",
+        )
+    )
 
     # League-wide leaders among all players
-    best_scorer = players.order_by("-points_per_game").first()
-    best_rebounder = players.order_by("-rebounds_per_game").first()
-    assist_leader = players.order_by("-assists_per_game").first()
-
-    # Best 2PT% and 3PT% (fractions -> will be *100 in template)
-    best_two_pct = (
-        players
-        .exclude(two_points_pct__isnull=True)
-        .order_by("-two_points_pct")
-        .first()
-    )
+    best_scorer = _leader(players, "points_per_game")
+    best_rebounder = _leader(players, "rebounds_per_game")
+    assist_leader = _leader(players, "assists_per_game")
 
-    best_three_pct = (
-        players
-        .exclude(three_points_pct__isnull=True)
-        .order_by("-three_points_pct")
-        .first()
-    )
+    # Best 2PT% and 3PT% (fractions; shown *100 via Player.*_pct_display)
+    best_two_pct = _leader(players, "two_points_pct")
+    best_three_pct = _leader(players, "three_points_pct")
 
     context = {
         "teams": teams,
@@ -98,29 +98,46 @@ def team_list(request):
 # ---------- Team detail: logo + scouting report + charts + table ----------
 
 def team_detail(request, team_id):
-    team = get_object_or_404(Team, pk=team_id)
-    players = Player.objects.filter(team=team)
+    team = get_object_or_404(
+        Team.objects.select_related("best_scorer", "best_rebounder", "assist_leader"),
+        pk=team_id,
+    )
+    # Fetch the roster once (table columns only); the table and charts
+    # both work from this list
+    players_list = list(
+        Player.objects.filter(team=team)
+        .only(
+            "name", "number", "position", "games",
+            "points_per_game", "rebounds_per_game", "assists_per_game",
+            "minutes_per_game", "rating", "fouls_per_game",
+            "two_points_pct", "three_points_pct",
+        )
+        .order_by("-points_per_game")
+    )
 
     # Top scorers & rebounders for charts
-    top_scorers = players.order_by("-points_per_game")[:5]
+    top_scorers = players_list[:5]
     scorers_names = [p.name for p in top_scorers]
     scorers_points = [float(p.points_per_game or 0) for p in top_scorers]
 
-    top_rebounders = players.order_by("-rebounds_per_game")[:5]
+    top_rebounders = sorted(
+        players_list, key=lambda p: -(p.rebounds_per_game or 0)
+    )[:5]
     rebound_names = [p.name for p in top_rebounders]
     rebound_values = [float(p.rebounds_per_game or 0) for p in top_rebounders]
 
     # Pie chart: scoring distribution (top 6 scorers)
-    pie_players = players.order_by("-points_per_game")[:6]
+    pie_players = players_list[:6]
     pie_labels = [p.name for p in pie_players]
     pie_values = [float(p.points_per_game or 0) for p in pie_players]
 
-    # AI-style scouting report text
-    scouting_report = build_scouting_report(team, players)
+    # Scouting report text: stored OpenAI report when enabled (never blocks
+    # the request), otherwise / until then the local stats-based summary
+    scouting_report = generate_team_report(team) or build_scouting_report(team)
 
     context = {
         "team": team,
-        "players": players.order_by("-points_per_game"),
+        "players": players_list,
         "scouting_report": scouting_report,
         "scorers_names": scorers_names,
         "scorers_points": scorers_points,
@@ -134,6 +151,9 @@ def team_detail(request, team_id):
 
 # ---------- Player search with filters ----------
 
+PLAYERS_PER_PAGE = 50
+
+
 def player_search(request):
     teams = Team.objects.all().order_by("name")
     players = Player.objects.select_related("team").all()
@@ -191,11 +211,24 @@ def player_search(request):
     if params["min_three_pt"] is not None:
         players = players.filter(three_points_pct__gte=params["min_three_pt"] / 100.0)
 
-    players = players.order_by("-rating", "-points_per_game")
+    # pk keeps the order stable across pages when ratings tie
+    players = players.order_by("-rating", "-points_per_game", "pk").only(
+        "name", "team__name", "number", "position",
+        "points_per_game", "rebounds_per_game", "assists_per_game",
+        "minutes_per_game", "rating", "fouls_per_game",
+        "two_points_pct", "three_points_pct",
+    )
+
+    # Render one page at a time; filters are carried over in page links
+    paginator = Paginator(players, PLAYERS_PER_PAGE)
+    page_obj = paginator.get_page(request.GET.get("page"))
+    query = request.GET.copy()
+    query.pop("page", None)
 
     context = {
         "teams": teams,
-        "players": players,
+        "page_obj": page_obj,
+        "query_string": query.urlencode(),
         "selected_team_id": team_id,
         "selected_position": position,
         "params": params,